@@ -0,0 +1,200 @@
+# loadtest.py
+# Reproducible load test for the eConsult backend (main.py).
+#
+# Drives a mixed workload of CSV uploads (small/medium/large single files and a
+# multi-file batch through /api/upload_csvs) and pie, wordcloud and trend GETs at
+# increasing concurrency, and reports p50/p95/p99 latency, throughput and status
+# codes per level. Uses only the standard library.
+#
+#   python loadtest.py --start-server                  # spawn uvicorn on a free port
+#   python loadtest.py --url http://127.0.0.1:8000     # run against a running server
+#   python loadtest.py --levels 1,4,16,64 --duration 20 --json results.json
+import argparse, csv, io, json, math, os, random, socket, subprocess, sys, threading, time, uuid
+import urllib.request, urllib.error
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(__file__)
+SAMPLE_PATH = os.path.join(BASE_DIR, "sample_dataset.csv")
+
+# rows per generated CSV upload
+UPLOAD_SIZES = {"upload_small": 50, "upload_medium": 1000, "upload_large": 10000}
+# files sent together by the "upload_multi" kind, as the frontend does
+UPLOAD_MULTI = ["upload_medium", "upload_small", "upload_medium"]
+# (request kind, weight)
+WORKLOAD = [
+    ("upload_small", 0.12),
+    ("upload_medium", 0.08),
+    ("upload_large", 0.05),
+    ("upload_multi", 0.05),
+    ("pie", 0.25),
+    ("wordcloud", 0.20),
+    ("trend", 0.25),
+]
+GET_PATHS = {
+    "pie": "/api/sentiment_pie.svg",
+    "wordcloud": "/api/wordcloud.svg",
+    "trend": "/api/sentiment_trend_chart",
+}
+
+def build_csvs(seed: int) -> dict:
+    """Generate one CSV body per upload size by resampling the sample dataset's comments."""
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        comments = [row["text"] for row in csv.DictReader(f)]
+    rng = random.Random(seed)
+    bodies = {}
+    for name, rows in UPLOAD_SIZES.items():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["id", "title", "comment"])
+        for i in range(rows):
+            writer.writerow([i + 1, f"Row {i + 1}", f"{rng.choice(comments)} {rng.randint(0, 9999)}"])
+        bodies[name] = buf.getvalue().encode("utf-8")
+    return bodies
+
+def multipart(field: str, files: list):
+    """Encode [(filename, content), ...] as one multipart body under `field`."""
+    boundary = uuid.uuid4().hex
+    body = b""
+    for filename, content in files:
+        body += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+                 f"Content-Type: text/csv\r\n\r\n").encode() + content + b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+def request(url: str, kind: str, csvs: dict, timeout: float):
+    """Issue one request; return (status, latency seconds). Status 0 means a transport error."""
+    if kind in UPLOAD_SIZES:
+        body, ctype = multipart("file", [(f"{kind}.csv", csvs[kind])])
+        req = urllib.request.Request(url + "/api/upload_csv", data=body, method="POST",
+                                     headers={"Content-Type": ctype})
+    elif kind == "upload_multi":
+        body, ctype = multipart("files", [(f"{k}_{i}.csv", csvs[k]) for i, k in enumerate(UPLOAD_MULTI)])
+        req = urllib.request.Request(url + "/api/upload_csvs", data=body, method="POST",
+                                     headers={"Content-Type": ctype})
+    else:
+        req = urllib.request.Request(url + GET_PATHS[kind])
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except Exception:
+        status = 0
+    return status, time.perf_counter() - t0
+
+def percentile(sorted_vals: list, p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    # nearest-rank percentile
+    k = min(len(sorted_vals) - 1, max(0, math.ceil(p / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+def summarize(samples: list, elapsed: float) -> dict:
+    ok = sorted(lat for _, status, lat in samples if 200 <= status < 300)
+    return {
+        "requests": len(samples),
+        "ok": len(ok),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(ok, 50) * 1000, 1),
+        "p95_ms": round(percentile(ok, 95) * 1000, 1),
+        "p99_ms": round(percentile(ok, 99) * 1000, 1),
+        "status": dict(Counter(str(status) for _, status, _ in samples)),
+    }
+
+def run_level(url: str, concurrency: int, duration: float, csvs: dict, seed: int, timeout: float) -> dict:
+    """Run `concurrency` closed-loop clients for `duration` seconds."""
+    kinds, weights = zip(*WORKLOAD)
+    deadline = time.perf_counter() + duration
+    samples, lock = [], threading.Lock()
+
+    def client(worker: int):
+        rng = random.Random(seed * 1000 + worker)
+        local = []
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            status, lat = request(url, kind, csvs, timeout)
+            local.append((kind, status, lat))
+        with lock:
+            samples.extend(local)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    result = {"concurrency": concurrency, "elapsed_s": round(elapsed, 2), **summarize(samples, elapsed)}
+    result["by_kind"] = {
+        kind: summarize([s for s in samples if s[0] == kind], elapsed) for kind in kinds
+    }
+    return result
+
+def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/api/status", timeout=2) as resp:
+                if resp.status == 200:
+                    return
+        except Exception:
+            time.sleep(0.2)
+    raise SystemExit(f"Server at {url} did not become ready within {timeout:g}s")
+
+def start_server(port: int) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", "1", "--log-level", "warning"]
+    return subprocess.Popen(cmd, cwd=BASE_DIR)
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test the eConsult FastAPI backend.")
+    ap.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of a running server")
+    ap.add_argument("--start-server", action="store_true",
+                    help="spawn a single uvicorn worker for main:app on a free port (server env vars "
+                         "such as MAX_HEAVY_REQUESTS are passed through)")
+    ap.add_argument("--levels", default="1,2,4,8,16,32", help="comma-separated concurrency levels")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request client timeout in seconds")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json", dest="json_path", help="also write the full results to this file")
+    args = ap.parse_args()
+
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+    csvs = build_csvs(args.seed)
+    server = None
+    url = args.url.rstrip("/")
+    if args.start_server:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = start_server(port)
+    try:
+        wait_ready(url)
+        # warm up so the first level doesn't pay for model loading / empty state
+        request(url, "upload_small", csvs, args.timeout)
+
+        results = []
+        print(f"{'conc':>5} {'reqs':>6} {'ok':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  status")
+        for level in levels:
+            r = run_level(url, level, args.duration, csvs, args.seed, args.timeout)
+            results.append(r)
+            print(f"{r['concurrency']:>5} {r['requests']:>6} {r['ok']:>6} {r['throughput_rps']:>8} "
+                  f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}  {r['status']}", flush=True)
+
+        if args.json_path:
+            with open(args.json_path, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "seed": args.seed, "duration_s": args.duration,
+                           "workload": dict(WORKLOAD), "levels": results}, f, indent=2)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
 # main.py (updated)
-from fastapi import FastAPI, UploadFile, File, HTTPException, Response, Body
+from fastapi import FastAPI, UploadFile, File, HTTPException, Response, Body, Depends
 from fastapi.middleware.cors import CORSMiddleware
 import pandas as pd
-import io, os, html, datetime, hashlib, math, random
+import io, os, re, sys, json, html, time, asyncio, datetime, hashlib, math, random, logging, threading
+from array import array
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from collections import Counter
 from typing import List, Tuple, Dict, Optional
 import joblib
 
+# Optional: scikit-learn powers incremental topic clustering (/api/topics)
+try:
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.feature_extraction.text import HashingVectorizer
+except ImportError:
+    MiniBatchKMeans = None
+
+logger = logging.getLogger("econsult")
+
 BASE_DIR = os.path.dirname(__file__)
 MODEL_PATH = os.path.join(BASE_DIR, "sentiment_model.joblib")
 
@@ -40,21 +54,256 @@ if os.path.exists(MODEL_PATH):
 else:
     app.state.model_loaded = False
 
+# ----------------------------
+# Script-based language identification. Each language is identified by its Unicode
+# block (Latin letters for English); the script with the most letters in a comment
+# wins, and comments with no letters at all (digits, emoji) are treated as English.
+DEFAULT_LANGUAGE = "en"
+SCRIPT_RANGES = {
+    "hi": ("\u0900", "\u097F"),  # Devanagari
+    "ta": ("\u0B80", "\u0BFF"),  # Tamil
+    "te": ("\u0C00", "\u0C7F"),  # Telugu
+    "kn": ("\u0C80", "\u0CFF"),  # Kannada
+    "ml": ("\u0D00", "\u0D7F"),  # Malayalam
+}
+LANGUAGES = (DEFAULT_LANGUAGE,) + tuple(SCRIPT_RANGES)
+_SCRIPT_PATTERNS = {DEFAULT_LANGUAGE: "[A-Za-z]",
+                    **{lang: f"[{lo}-{hi}]" for lang, (lo, hi) in SCRIPT_RANGES.items()}}
+_SCRIPT_REGEXES = {lang: re.compile(pat) for lang, pat in _SCRIPT_PATTERNS.items()}
+
+# Optional per-language models (sentiment_model_<lang>.joblib). Languages without
+# a dedicated model use the default model, or the rule-based lexicon if none.
+language_models: Dict[str, object] = {}
+for _lang in LANGUAGES:
+    _path = os.path.join(BASE_DIR, f"sentiment_model_{_lang}.joblib")
+    if os.path.exists(_path):
+        try:
+            language_models[_lang] = joblib.load(_path)
+        except Exception:
+            pass
+
+# ----------------------------
+# Compact in-memory result store. Rows are kept as parallel arrays instead of one
+# dict per row: sentiment/language as small integer codes, confidence as float32,
+# and the summary as a (start, end) span into the comment it was cut from.
+class ResultStore:
+    __slots__ = ("ids", "titles", "comments", "label_codes", "labels", "_label_index",
+                 "confidences", "summary_spans", "language_codes")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.titles: List = []
+        self.comments: List[str] = []
+        self.label_codes = array("H")
+        self.labels: List[str] = []
+        self._label_index: Dict[str, int] = {}
+        self.confidences = array("f")
+        self.summary_spans = array("I")  # start, end pairs
+        self.language_codes = array("B")
+
+    def __len__(self) -> int:
+        return len(self.comments)
+
+    def _label_code(self, label: str) -> int:
+        code = self._label_index.get(label)
+        if code is None:
+            code = self._label_index[label] = len(self.labels)
+            self.labels.append(sys.intern(label))
+        return code
+
+    def append(self, row_id: int, title, comment: str, sentiment: str, confidence: float, language: str):
+        # summary is the first sentence of the comment, stripped
+        head = comment.split(".", 1)[0]
+        start = len(head) - len(head.lstrip())
+        end = len(head.rstrip())
+        self.ids.append(row_id)
+        self.titles.append(sys.intern(title) if isinstance(title, str) else title)
+        self.comments.append(comment)
+        self.label_codes.append(self._label_code(sentiment))
+        self.confidences.append(confidence)
+        self.summary_spans.extend((start, max(start, end)))
+        self.language_codes.append(LANGUAGES.index(language))
+
+    def row(self, i: int) -> Dict:
+        comment = self.comments[i]
+        start, end = self.summary_spans[2 * i], self.summary_spans[2 * i + 1]
+        return {
+            "id": self.ids[i],
+            "title": self.titles[i],
+            "comment": comment,
+            "sentiment": self.labels[self.label_codes[i]],
+            "confidence": round(float(self.confidences[i]), 2),
+            "summary": comment[start:end],
+            "language": LANGUAGES[self.language_codes[i]]
+        }
+
+    def extend(self, other: "ResultStore", id_offset: int = 0):
+        """Append all rows of `other` (ids shifted by id_offset), remapping its label codes onto this store's table."""
+        remap = [self._label_code(label) for label in other.labels]
+        self.ids.extend((i + id_offset for i in other.ids) if id_offset else other.ids)
+        self.titles.extend(other.titles)
+        self.comments.extend(other.comments)
+        self.label_codes.extend(remap[c] for c in other.label_codes)
+        self.confidences.extend(other.confidences)
+        self.summary_spans.extend(other.summary_spans)
+        self.language_codes.extend(other.language_codes)
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> List[Dict]:
+        return [self.row(i) for i in range(start, len(self) if stop is None else stop)]
+
+    def label_language_pairs(self):
+        labels = self.labels
+        return ((labels[c], LANGUAGES[l]) for c, l in zip(self.label_codes, self.language_codes))
+
+    def nbytes(self) -> int:
+        """Approximate resident size of the store, including the comment strings."""
+        arrays = (self.ids, self.label_codes, self.confidences, self.summary_spans, self.language_codes)
+        size = sum(sys.getsizeof(a) for a in arrays)
+        size += sys.getsizeof(self.comments) + sum(sys.getsizeof(c) for c in self.comments)
+        # titles are interned, so count each distinct object once
+        distinct_titles = {id(t): t for t in self.titles}.values()
+        size += sys.getsizeof(self.titles) + sum(sys.getsizeof(t) for t in distinct_titles)
+        return size
+
 # In-memory store for last uploaded comments (wordcloud generation)
 last_comments: List[str] = []
 # In-memory store for last analysis results (used for pie chart)
-last_results: List[Dict] = []
+last_store = ResultStore()
+# Sentiment counts (overall + per language) precomputed at ingest
+last_stats: Dict = {}
 # Trend bookkeeping (optional frontend usage)
 trend_points: List[Dict] = []
 TREND_MAX_POINTS = 80
 
+# Worker budget for parsing/classifying uploaded files. Classification is pure Python and
+# holds the GIL, so files are processed in worker processes; the thread pool only keeps
+# lighter bookkeeping off the event loop.
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", min(4, os.cpu_count() or 1)))
+upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="upload")
+_classify_executor: Optional[ProcessPoolExecutor] = None
+
+def classify_executor() -> ProcessPoolExecutor:
+    """Process pool for CSV parsing/classification, created on first use ("spawn" is safe with the server's threads)."""
+    global _classify_executor
+    if _classify_executor is None:
+        _classify_executor = ProcessPoolExecutor(max_workers=UPLOAD_WORKERS,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+    return _classify_executor
+
+async def run_classify(fn, *args):
+    """Run `fn` on the classify pool. If a worker died (OOM, SIGKILL) the pool is unusable;
+    drop it so the next call builds a fresh one and answer 503 instead of blaming the input."""
+    global _classify_executor
+    pool = classify_executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        if _classify_executor is pool:
+            _classify_executor = None
+            pool.shutdown(wait=False, cancel_futures=True)
+        logger.warning("classify worker pool broke; it will be restarted on the next request")
+        raise HTTPException(status_code=503, detail="Classification workers restarted. Please retry.",
+                            headers={"Retry-After": "1"})
+
+@app.on_event("startup")
+def _prestart_classify_workers():
+    # spawn the worker processes up front so the first upload doesn't pay their import time
+    pool = classify_executor()
+    for _ in range(UPLOAD_WORKERS):
+        pool.submit(os.getpid)
+
+@app.on_event("shutdown")
+def _shutdown_executors():
+    if _classify_executor is not None:
+        _classify_executor.shutdown(cancel_futures=True)
+    upload_executor.shutdown(wait=False)
+
+# ----------------------------
+# Admission control for CPU-heavy endpoints (uploads, set_comments, wordcloud).
+# At most MAX_HEAVY_REQUESTS run at once; up to HEAVY_QUEUE_SIZE more wait for a
+# slot for HEAVY_QUEUE_TIMEOUT seconds. Anything beyond that gets a 503 with
+# Retry-After instead of piling up. MAX_HEAVY_REQUESTS=0 disables the limit.
+MAX_HEAVY_REQUESTS = int(os.environ.get("MAX_HEAVY_REQUESTS", 4))
+HEAVY_QUEUE_SIZE = int(os.environ.get("HEAVY_QUEUE_SIZE", 16))
+HEAVY_QUEUE_TIMEOUT = float(os.environ.get("HEAVY_QUEUE_TIMEOUT", 10))
+
+class AdmissionController:
+    def __init__(self, max_active: int, max_queue: int, timeout: float):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(max_active) if max_active > 0 else None
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        raise HTTPException(status_code=503, detail=f"Server busy: {reason}. Please retry.",
+                            headers={"Retry-After": str(max(1, math.ceil(self.timeout)))})
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots is None:
+            yield
+            return
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self._reject("request queue is full")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                self._reject(f"no worker free within {self.timeout:g}s")
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def snapshot(self) -> Dict:
+        return {"active": self.active, "waiting": self.waiting, "rejected": self.rejected,
+                "max_active": self.max_active, "max_queue": self.max_queue, "timeout": self.timeout}
+
+admission = AdmissionController(MAX_HEAVY_REQUESTS, HEAVY_QUEUE_SIZE, HEAVY_QUEUE_TIMEOUT)
+
+async def heavy_request():
+    """Dependency that holds an admission slot for the duration of the request."""
+    async with admission.slot():
+        yield
+
 @app.get("/")
 def root():
     return {"message": "SIH eConsult final backend running", "time": datetime.datetime.utcnow().isoformat()}
 
 @app.get("/api/status")
 def status():
-    return {"status": "ok", "model_loaded": bool(model)}
+    return {"status": "ok", "model_loaded": bool(model),
+            "language_models": sorted(language_models),
+            "stored_rows": len(last_store),
+            "admission": admission.snapshot()}
+
+def detect_language(text: str) -> str:
+    """Return the language code whose script has the most letters in `text` (English if none)."""
+    best, best_count = DEFAULT_LANGUAGE, 0
+    for lang, rx in _SCRIPT_REGEXES.items():
+        n = len(rx.findall(text or ""))
+        if n > best_count:
+            best, best_count = lang, n
+    return best
+
+def detect_language_series(comments: pd.Series) -> pd.Series:
+    """Vectorized detect_language over a Series of comment strings."""
+    if comments.empty:
+        return pd.Series([], index=comments.index, dtype=object)
+    counts = pd.DataFrame({lang: comments.str.count(pat) for lang, pat in _SCRIPT_PATTERNS.items()},
+                          index=comments.index)
+    return counts.idxmax(axis=1).where(counts.max(axis=1) > 0, DEFAULT_LANGUAGE)
 
 # ----------------------------
 # Deterministic jitter & improved rule/model fallback
@@ -69,60 +318,40 @@ def _deterministic_jitter(comment: str, scale: float = 0.04) -> float:
 def _normalize_conf(conf: float) -> float:
     return max(0.0, min(1.0, conf))
 
-def rule_sentiment(comment: str) -> Tuple[str, float]:
+# Per-language lexicons as (base confidence, jitter scale, positive keywords, negative keywords)
+# tiers, checked in order. Other languages are treated as slightly strong.
+# Emoji belong to no script, so they live in a shared tier checked after every language's own.
+LEXICONS: Dict[str, List[Tuple[float, float, List[str], List[str]]]] = {
+    "en": [
+        (0.86, 0.04, ["great", "excellent", "well", "improve"],
+                     ["poor", "harsh", "bad", "oppose","didnt"]),
+        (0.78, 0.05, ["good", "support", "positive", "benefit", "help"],
+                     ["concern", "problem", "issue", "confusing", "burden"]),
+    ],
+    "ta": [(0.84, 0.04, ["உதவி", "நன்மை", "சிறந்த", "மகிழ்ச்சி","நல்லது","திருப்தி"],
+                        ["தவறு", "பிரச்சனை","மோசமாக", "மோசமான", "எதிர்ப்பு", "கவலை","சிரமம்"])],
+    "te": [(0.84, 0.04, ["మంచి", "ప్రయోజనం", "సహాయం", "సంతోషం", "లాభం"],
+                        ["చెడు", "భారం", "సమస్య", "తప్పు","అస్పష్టంగా "])],
+    "ml": [(0.84, 0.04, ["നല്ലത്", "ഫലപ്രദം","ജനങ്ങൾക്ക് ", "ഉപകാരപ്രദം", "ഉത്തമം"],
+                        ["മോശം", "പ്രശ്നം", "ഭാരം","പ്രശ്നങ്ങൾ ", "തകരാറ്"])],
+    "kn": [(0.84, 0.04, ["ಉತ್ತಮ", "ಲಾಭ", "ಸಹಾಯ"],
+                        ["ಕೆಟ್ಟ", "ಸಮಸ್ಯೆ", "ಭಾರ", "ತಪ್ಪು","ತೊಂದರೆ"])],
+    "hi": [(0.84, 0.04, ["अच्छा", "लाभ", "सहायता", "सकारात्मक", "बेहतरीन", "उपयोगी"],
+                        ["खराब", "समस्या", "विपरीत", "बुरा", "बोझ","क्योंकि "])],
+}
+SHARED_LEXICON = [(0.84, 0.04, ["😀", "🔥", "😂"], ["😭", "😶"])]
+
+def rule_sentiment(comment: str, lang: Optional[str] = None) -> Tuple[str, float]:
     s = (comment or "").lower()
+    if lang is None:
+        lang = detect_language(s)
 
-    pos_en_strong = ["great", "excellent", "well", "improve"]
-    pos_en_weak   = ["good", "support", "positive", "benefit", "help"]
-    neg_en_strong = ["poor", "harsh", "bad", "oppose","didnt"]
-    neg_en_weak   = ["concern", "problem", "issue", "confusing", "burden"]
-
-    pos_ta = ["உதவி","😀", "நன்மை", "சிறந்த", "மகிழ்ச்சி","நல்லது","திருப்தி"]
-    neg_ta = ["தவறு", "பிரச்சனை","😭","மோசமாக", "மோசமான", "எதிர்ப்பு", "கவலை","சிரமம்"]
-
-    pos_te = ["మంచి", "ప్రయోజనం", "సహాయం","🔥", "సంతోషం", "లాభం"]
-    neg_te = ["చెడు", "భారం", "సమస్య", "తప్పు","అస్పష్టంగా "]
-
-    pos_ml = ["നല്ലത്", "ഫലപ്രദം","ജനങ്ങൾക്ക് ", "ഉപകാരപ്രദം", "ഉത്തമം"]
-    neg_ml = ["മോശം", "പ്രശ്നം", "ഭാരം","പ്രശ്നങ്ങൾ ", "തകരാറ്","😶"]
-
-    pos_kn = ["ಉತ್ತಮ", "ಲಾಭ", "ಸಹಾಯ","😂"]
-    neg_kn = ["ಕೆಟ್ಟ", "ಸಮಸ್ಯೆ", "ಭಾರ", "ತಪ್ಪು","ತೊಂದರೆ"]
-
-    pos_hi = ["अच्छा", "लाभ", "सहायता", "सकारात्मक", "बेहतरीन", "उपयोगी"]
-    neg_hi = ["खराब", "समस्या", "विपरीत", "बुरा", "बोझ","क्योंकि "]
-
-    def check_lists(kw_list):
-        for kw in kw_list:
-            if kw in s:
-                return True
-        return False
-
-    # strong english
-    if check_lists(pos_en_strong) or check_lists(neg_en_strong):
-        if any(k in s for k in pos_en_strong):
-            base, label = 0.86, "positive"
-        else:
-            base, label = 0.86, "negative"
-        return label, round(_normalize_conf(base + _deterministic_jitter(comment, 0.04)), 3)
-
-    # weak english
-    if check_lists(pos_en_weak) or check_lists(neg_en_weak):
-        if any(k in s for k in pos_en_weak):
-            base, label = 0.78, "positive"
-        else:
-            base, label = 0.78, "negative"
-        return label, round(_normalize_conf(base + _deterministic_jitter(comment, 0.05)), 3)
-
-    # other languages (treated as slightly strong)
-    for kw in pos_hi + pos_ta + pos_te + pos_ml + pos_kn:
-        if kw in s:
-            base = 0.84
-            return "positive", round(_normalize_conf(base + _deterministic_jitter(comment, 0.04)), 3)
-    for kw in neg_hi + neg_ta + neg_te + neg_ml + neg_kn:
-        if kw in s:
-            base = 0.84
-            return "negative", round(_normalize_conf(base + _deterministic_jitter(comment, 0.04)), 3)
+    # only the comment's own language lexicon (plus the shared emoji tier) is consulted
+    for base, jitter, pos_kws, neg_kws in LEXICONS.get(lang, LEXICONS[DEFAULT_LANGUAGE]) + SHARED_LEXICON:
+        if any(k in s for k in pos_kws):
+            return "positive", round(_normalize_conf(base + _deterministic_jitter(comment, jitter)), 3)
+        if any(k in s for k in neg_kws):
+            return "negative", round(_normalize_conf(base + _deterministic_jitter(comment, jitter)), 3)
 
     if not s.strip():
         return "neutral", 0.40
@@ -130,20 +359,23 @@ def rule_sentiment(comment: str) -> Tuple[str, float]:
     base = 0.64
     return "neutral", round(_normalize_conf(base + _deterministic_jitter(comment, 0.06)), 3)
 
-def safe_model_predict(comment: str) -> Tuple[str, float]:
+def safe_model_predict(comment: str, lang: Optional[str] = None) -> Tuple[str, float]:
+    if lang is None:
+        lang = detect_language(comment)
+    clf = language_models.get(lang, model)
     try:
-        if not model:
-            return rule_sentiment(comment)
-        pred = model.predict([comment])[0]
+        if not clf:
+            return rule_sentiment(comment, lang)
+        pred = clf.predict([comment])[0]
         prob_val = None
         try:
-            proba = model.predict_proba([comment])[0]
+            proba = clf.predict_proba([comment])[0]
             prob_val = float(max(proba))
         except Exception:
             prob_val = None
 
-        if hasattr(model, "classes_"):
-            classes = model.classes_
+        if hasattr(clf, "classes_"):
+            classes = clf.classes_
             if all(isinstance(c, str) for c in classes):
                 label = str(pred)
             else:
@@ -153,12 +385,12 @@ def safe_model_predict(comment: str) -> Tuple[str, float]:
             label = str(pred)
 
         if prob_val is None:
-            _, derived_conf = rule_sentiment(comment)
+            _, derived_conf = rule_sentiment(comment, lang)
             return label, round(float(derived_conf), 3)
         else:
             return label, round(float(prob_val), 3)
     except Exception:
-        return rule_sentiment(comment)
+        return rule_sentiment(comment, lang)
 
 # ---------- helper to parse one CSV bytes -> DataFrame (normalize comment col) ----------
 def _read_csv_bytes(content: bytes) -> pd.DataFrame:
@@ -180,24 +412,17 @@ def _read_csv_bytes(content: bytes) -> pd.DataFrame:
         raise HTTPException(status_code=400, detail="CSV must contain 'comment' column (or 'text'/'body').")
     return df
 
-# ----------------------------
-# Single-file upload (keeps compatibility)
-@app.post("/api/upload_csv")
-async def upload_csv(file: UploadFile = File(...)):
-    global last_comments, last_results, trend_points
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Please upload a CSV file (.csv).")
-    content = await file.read()
-    df = _read_csv_bytes(content)
-
-    results = []
-    comments_storage = []
+def _analyze_frame(df: pd.DataFrame, store: ResultStore, id_start: int = 0) -> ResultStore:
+    """Classify every row of a parsed CSV into `store`. Rows without an 'id' column are numbered from id_start + 1."""
     cols_lower = {c.lower(): c for c in df.columns}
     has_conf_col = "confidence" in cols_lower
 
-    for idx, row in df.iterrows():
-        comment = str(row.get(cols_lower.get("comment"), "") or "").strip()
-        comments_storage.append(comment)
+    comments = df[cols_lower["comment"]].map(lambda v: str(v or "").strip())
+    languages = detect_language_series(comments)
+
+    for pos, (idx, row) in enumerate(df.iterrows()):
+        comment = comments[idx]
+        lang = languages[idx]
         csv_conf = None
         if has_conf_col:
             try:
@@ -208,10 +433,10 @@ async def upload_csv(file: UploadFile = File(...)):
                 csv_conf = None
 
         if csv_conf is not None:
-            sentiment, _ = safe_model_predict(comment) if model else rule_sentiment(comment)
+            sentiment, _ = safe_model_predict(comment, lang)
             confidence = float(csv_conf)
         else:
-            sentiment, confidence = safe_model_predict(comment) if model else rule_sentiment(comment)
+            sentiment, confidence = safe_model_predict(comment, lang)
 
         if "sentiment" in cols_lower:
             scol = cols_lower["sentiment"]
@@ -219,129 +444,279 @@ async def upload_csv(file: UploadFile = File(...)):
             if raw_label and str(raw_label).strip():
                 sentiment = str(raw_label).strip()
 
-        summary = (comment.split(".")[0].strip()) if comment else ""
-        results.append({
-            "id": int(row.get(cols_lower.get("id"), idx + 1)) if cols_lower.get("id") else (idx + 1),
-            "title": row.get(cols_lower.get("title"), "") if cols_lower.get("title") else "",
-            "comment": comment,
-            "sentiment": sentiment,
-            "confidence": round(float(confidence), 3),
-            "summary": summary
-        })
-
-    # normalize confidences to 2 dp for frontend display and update memory
-    for r in results:
+        # normalize confidences to 2 dp for frontend display
         try:
-            r["confidence"] = round(float(r.get("confidence", 0.0)), 2)
+            confidence = round(round(float(confidence), 3), 2)
         except Exception:
-            r["confidence"] = 0.6
-
-    last_comments = comments_storage
-    last_results = results
+            confidence = 0.6
+
+        default_id = id_start + pos + 1
+        store.append(
+            int(row.get(cols_lower.get("id"), default_id)) if cols_lower.get("id") else default_id,
+            row.get(cols_lower.get("title"), "") if cols_lower.get("title") else "",
+            comment,
+            sentiment,
+            confidence,
+            lang,
+        )
+    return store
+
+def _empty_counts() -> Dict[str, int]:
+    return {"positive": 0, "neutral": 0, "negative": 0, "total": 0}
+
+def _sentiment_stats(pairs) -> Dict:
+    """Aggregate (sentiment, language) pairs into overall and per-language counts."""
+    stats = _empty_counts()
+    by_language: Dict[str, Dict[str, int]] = {}
+    for label, lang in pairs:
+        lab = str(label).lower()
+        if lab not in ("positive", "negative"):
+            lab = "neutral"
+        bucket = by_language.setdefault(lang or DEFAULT_LANGUAGE, _empty_counts())
+        for counts in (stats, bucket):
+            counts[lab] += 1
+            counts["total"] += 1
+    stats["by_language"] = by_language
+    return stats
+
+def _stats_from_comments(comments: List[str]) -> Dict:
+    languages = detect_language_series(pd.Series(comments, dtype=object))
+    return _sentiment_stats((safe_model_predict(c, lang)[0], lang) for c, lang in zip(comments, languages))
+
+def _record_trend_point(stats: Dict):
+    now_iso = datetime.datetime.utcnow().isoformat()
+    point = {"time": now_iso, "positive": stats["positive"], "neutral": stats["neutral"],
+             "negative": stats["negative"], "total": stats["total"]}
+    trend_points.append(point)
+    if len(trend_points) > TREND_MAX_POINTS:
+        trend_points[:] = trend_points[-TREND_MAX_POINTS:]
 
-    # update trend_points
+# ----------------------------
+# Topic clustering. Comments are embedded with the TF-IDF step of the loaded model
+# (or a stateless hashing vectorizer over word tokens when there is none)
+# and clustered with MiniBatchKMeans, updated via partial_fit on every upload.
+TOPIC_COUNT = int(os.environ.get("TOPIC_COUNT", 8))
+TOPIC_TOP_TERMS = 8
+TOPIC_MAX_DATASETS = 20
+TOPIC_STOPWORDS = {
+    "the", "and", "for", "are", "was", "this", "that", "with", "will", "have", "has", "not",
+    "but", "from", "they", "their", "its", "our", "can", "should", "would", "more", "very",
+    "been", "which", "there", "also", "into", "than", "these", "those", "some", "all",
+}
+
+class TopicModel:
+    def __init__(self, n_topics: int):
+        self.n_topics = n_topics
+        self.kmeans = MiniBatchKMeans(n_clusters=n_topics, random_state=0, n_init=3)
+        self.fitted = False
+        # comments seen before there were enough to fit the first batch
+        self._pending: List[str] = []
+        self._hashing = None
+
+    def _features(self, comments: List[str]):
+        steps = getattr(model, "named_steps", {})
+        if "tfidf" in steps:
+            return steps["tfidf"].transform(comments)
+        if self._hashing is None:
+            # hash the same word tokens used for top terms; char n-grams cost ~10x more here
+            self._hashing = HashingVectorizer(analyzer=_topic_terms, n_features=2 ** 18, alternate_sign=False)
+        return self._hashing.transform(comments)
+
+    def update(self, comments: List[str]) -> Optional[array]:
+        """Fold `comments` into the clustering and return their topic ids, or None if not fitted yet."""
+        if not comments:
+            return None
+        if not self.fitted:
+            batch = self._pending + comments
+            if len(batch) < self.n_topics:
+                self._pending = batch
+                return None
+            features = self._features(batch)
+            self.kmeans.partial_fit(features)
+            # the new comments are the tail of the batch
+            features = features[len(self._pending):]
+            self._pending = []
+            self.fitted = True
+        else:
+            features = self._features(comments)
+            self.kmeans.partial_fit(features)
+        return array("H", self.kmeans.predict(features).tolist())
+
+def _topic_terms(comment: str) -> List[str]:
+    words = (w.strip(".,;:!?\"'()[]{}“”‘’…-").lower() for w in comment.split())
+    return [w for w in words if len(w) > 2 and w not in TOPIC_STOPWORDS and not w.isdigit()]
+
+def _topic_aggregates(store: ResultStore, assignments: array) -> List[Dict]:
+    """Per-topic size, sentiment breakdown and top terms for one dataset."""
+    topics = {}
+    terms: Dict[int, Counter] = {}
+    for (label, _), comment, topic in zip(store.label_language_pairs(), store.comments, assignments):
+        counts = topics.setdefault(topic, _empty_counts())
+        lab = str(label).lower()
+        counts[lab if lab in ("positive", "negative") else "neutral"] += 1
+        counts["total"] += 1
+        terms.setdefault(topic, Counter()).update(_topic_terms(comment))
+    return [dict(topic=t, terms=[w for w, _ in terms[t].most_common(TOPIC_TOP_TERMS)], **topics[t])
+            for t in sorted(topics, key=lambda t: -topics[t]["total"])]
+
+topic_model = TopicModel(TOPIC_COUNT) if MiniBatchKMeans is not None else None
+# Per-dataset (one per upload) topic assignments and precomputed aggregates
+topic_datasets: Dict[int, Dict] = {}
+_dataset_seq = 0
+# Clustering runs on the upload thread pool: _topic_fit_lock serializes updates of the
+# model, _topic_datasets_lock guards topic_datasets and the dataset sequence.
+_topic_fit_lock = threading.Lock()
+_topic_datasets_lock = threading.Lock()
+
+def _record_topics(store: ResultStore):
+    """Cluster one uploaded dataset and store its topic aggregates (call off the event loop)."""
+    global _dataset_seq
+    if topic_model is None:
+        return
     try:
-        pos = sum(1 for r in results if str(r.get("sentiment")).lower() == "positive")
-        neg = sum(1 for r in results if str(r.get("sentiment")).lower() == "negative")
-        neu = sum(1 for r in results if str(r.get("sentiment")).lower() == "neutral")
-        now_iso = datetime.datetime.utcnow().isoformat()
-        point = {"time": now_iso, "positive": pos, "neutral": neu, "negative": neg, "total": len(results)}
-        trend_points.append(point)
-        if len(trend_points) > TREND_MAX_POINTS:
-            trend_points[:] = trend_points[-TREND_MAX_POINTS:]
+        with _topic_fit_lock:
+            assignments = topic_model.update(store.comments)
+        entry = {
+            "time": datetime.datetime.utcnow().isoformat(),
+            "rows": len(store),
+            "assignments": assignments,
+            "topics": _topic_aggregates(store, assignments) if assignments is not None else [],
+        }
     except Exception:
-        pass
+        logger.exception("Topic clustering failed for a %d-row dataset", len(store))
+        return
+    with _topic_datasets_lock:
+        # number datasets only once they are stored, so a failed upload leaves no gap
+        _dataset_seq += 1
+        entry["dataset"] = _dataset_seq
+        topic_datasets[_dataset_seq] = entry
+        while len(topic_datasets) > TOPIC_MAX_DATASETS:
+            del topic_datasets[next(iter(topic_datasets))]
+
+# Serializes writes of last_comments/last_store/last_stats/trend_points, which happen on
+# the upload thread pool
+_store_lock = threading.Lock()
+
+def _store_results(store: ResultStore):
+    """Replace the in-memory store with a fresh batch of results and update aggregates."""
+    global last_comments, last_store, last_stats
+    stats = _sentiment_stats(store.label_language_pairs())
+    with _store_lock:
+        last_comments = store.comments
+        last_store = store
+        last_stats = stats
+        try:
+            _record_trend_point(stats)
+        except Exception:
+            pass
+
+def _json_dumps(obj) -> str:
+    # same settings as FastAPI's JSONResponse
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+def _commit_upload(store: ResultStore, files: Optional[List[Dict]] = None) -> bytes:
+    """Publish an analyzed upload and build its JSON response body (call off the event loop).
+    The rows are encoded once and reused for both "results" and "rows"; returning a prebuilt
+    body keeps FastAPI from running jsonable_encoder over every row on the event loop."""
+    _store_results(store)
+    _record_topics(store)
+    rows = _json_dumps(store.rows())
+    body = f'{{"inserted":{len(store)},"results":{rows},"rows":{rows}'
+    if files is not None:
+        body += f',"files":{_json_dumps(files)}'
+    return (body + "}").encode("utf-8")
+
+# ----------------------------
+# Single-file upload (keeps compatibility)
+@app.post("/api/upload_csv", dependencies=[Depends(heavy_request)])
+async def upload_csv(file: UploadFile = File(...)):
+    if not file.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Please upload a CSV file (.csv).")
+    content = await file.read()
+    # everything CPU-bound runs off the event loop so light requests keep being served
+    loop = asyncio.get_running_loop()
+    res = await run_classify(_process_csv, content)
+    if res["error"]:
+        raise HTTPException(status_code=400, detail=res["error"])
 
-    return {"inserted": len(df), "results": results, "rows": results}
+    body = await loop.run_in_executor(upload_executor, _commit_upload, res["store"])
+    return Response(content=body, media_type="application/json")
 
 # ----------------------------
 # New endpoint: accept multiple CSV files in one request
-@app.post("/api/upload_csvs")
+def _error_detail(exc: Exception) -> str:
+    return str(exc.detail) if isinstance(exc, HTTPException) else f"{type(exc).__name__}: {exc}"
+
+def _process_csv(content: bytes) -> Dict:
+    """Parse and classify one CSV (runs in a worker process). Default ids start at 1;
+    the caller shifts them once it knows the file's place in the batch."""
+    report = {"store": None, "has_ids": False, "parse_ms": None, "classify_ms": None, "error": None}
+    try:
+        t0 = time.perf_counter()
+        df = _read_csv_bytes(content)
+        t1 = time.perf_counter()
+        report["parse_ms"] = round((t1 - t0) * 1000, 1)
+        report["has_ids"] = any(c.lower() == "id" for c in df.columns)
+        report["store"] = _analyze_frame(df, ResultStore())
+        report["classify_ms"] = round((time.perf_counter() - t1) * 1000, 1)
+    except Exception as e:
+        # HTTPException does not survive pickling back to the parent; report the message
+        report["error"] = _error_detail(e)
+    return report
+
+@app.post("/api/upload_csvs", dependencies=[Depends(heavy_request)])
 async def upload_multiple_csvs(files: List[UploadFile] = File(...)):
     """
-    Accept multiple CSV files at once. The endpoint will merge rows from all files,
-    run the same sentiment logic on each row, update last_comments/last_results,
-    and return combined results.
+    Accept multiple CSV files at once. Each file is parsed and classified in its own
+    worker process (UPLOAD_WORKERS). Rows are merged in upload order and default ids
+    are numbered consecutively across the files that succeeded, as if only those files
+    had been concatenated. A file that fails is reported under "files" and skipped
+    rather than aborting the batch; each report's "row_range" gives the [start, end)
+    indexes of that file's rows in "results".
     """
-    global last_comments, last_results, trend_points
     if not files or len(files) == 0:
         raise HTTPException(status_code=400, detail="Please upload one or more CSV files.")
 
-    combined_results = []
-    combined_comments = []
-    total_rows = 0
-
-    for file in files:
-        if not file.filename.lower().endswith(".csv"):
-            raise HTTPException(status_code=400, detail=f"File {file.filename} is not a CSV.")
-        content = await file.read()
-        df = _read_csv_bytes(content)
-        cols_lower = {c.lower(): c for c in df.columns}
-        has_conf_col = "confidence" in cols_lower
-
-        for idx, row in df.iterrows():
-            total_rows += 1
-            comment = str(row.get(cols_lower.get("comment"), "") or "").strip()
-            combined_comments.append(comment)
-            csv_conf = None
-            if has_conf_col:
-                try:
-                    raw = row.get(cols_lower.get("confidence"))
-                    if raw is not None and str(raw).strip() != "":
-                        csv_conf = float(raw)
-                except Exception:
-                    csv_conf = None
-
-            if csv_conf is not None:
-                sentiment, _ = safe_model_predict(comment) if model else rule_sentiment(comment)
-                confidence = float(csv_conf)
-            else:
-                sentiment, confidence = safe_model_predict(comment) if model else rule_sentiment(comment)
-
-            if "sentiment" in cols_lower:
-                scol = cols_lower["sentiment"]
-                raw_label = row.get(scol, None)
-                if raw_label and str(raw_label).strip():
-                    sentiment = str(raw_label).strip()
-
-            summary = (comment.split(".")[0].strip()) if comment else ""
-            combined_results.append({
-                "id": int(row.get(cols_lower.get("id"), total_rows)) if cols_lower.get("id") else total_rows,
-                "title": row.get(cols_lower.get("title"), "") if cols_lower.get("title") else "",
-                "comment": comment,
-                "sentiment": sentiment,
-                "confidence": round(float(confidence), 3),
-                "summary": summary
-            })
-
-    # normalize confidences and update memory
-    for r in combined_results:
-        try:
-            r["confidence"] = round(float(r.get("confidence", 0.0)), 2)
-        except Exception:
-            r["confidence"] = 0.6
-
-    last_comments = combined_comments
-    last_results = combined_results
-
-    # update trend_points for this combined batch
-    try:
-        pos = sum(1 for r in combined_results if str(r.get("sentiment")).lower() == "positive")
-        neg = sum(1 for r in combined_results if str(r.get("sentiment")).lower() == "negative")
-        neu = sum(1 for r in combined_results if str(r.get("sentiment")).lower() == "neutral")
-        now_iso = datetime.datetime.utcnow().isoformat()
-        point = {"time": now_iso, "positive": pos, "neutral": neu, "negative": neg, "total": len(combined_results)}
-        trend_points.append(point)
-        if len(trend_points) > TREND_MAX_POINTS:
-            trend_points[:] = trend_points[-TREND_MAX_POINTS:]
-    except Exception:
-        pass
-
-    return {"inserted": total_rows, "results": combined_results, "rows": combined_results}
+    loop = asyncio.get_running_loop()
+    reports = [{"filename": f.filename, "rows": 0, "row_range": None, "parse_ms": None, "classify_ms": None,
+                "error": None} for f in files]
+    contents = await asyncio.gather(*(f.read() for f in files))
+
+    async def process(i: int) -> Dict:
+        if not files[i].filename.lower().endswith(".csv"):
+            return {"store": None, "error": f"File {files[i].filename} is not a CSV."}
+        return await run_classify(_process_csv, contents[i])
+
+    processed = await asyncio.gather(*(process(i) for i in range(len(files))), return_exceptions=True)
+    for res in processed:
+        # a dead worker is a server fault, not a problem with the user's file
+        if isinstance(res, HTTPException) and res.status_code == 503:
+            raise res
+
+    # ids are offset only once a file has succeeded, so failed files leave no gaps
+    store = ResultStore()
+    for i, res in enumerate(processed):
+        if isinstance(res, Exception):
+            reports[i]["error"] = _error_detail(res)
+            continue
+        for key in ("parse_ms", "classify_ms", "error"):
+            reports[i][key] = res.get(key)
+        file_store = res["store"]
+        if file_store is None:
+            continue
+        reports[i]["rows"] = len(file_store)
+        reports[i]["row_range"] = [len(store), len(store) + len(file_store)]
+        store.extend(file_store, id_offset=0 if res["has_ids"] else len(store))
+
+    if not len(store) and all(r["error"] for r in reports):
+        raise HTTPException(status_code=400, detail={"message": "No CSV file could be processed.", "files": reports})
+
+    body = await loop.run_in_executor(upload_executor, _commit_upload, store, reports)
+    return Response(content=body, media_type="application/json")
 
 # ----------------------------
 # Wordcloud endpoint (keeps your decorative SVG)
-@app.get("/api/wordcloud.svg")
+@app.get("/api/wordcloud.svg", dependencies=[Depends(heavy_request)])
 def wordcloud_svg(limit_words: int = 120):
     import html as _html
     global last_comments
@@ -456,64 +831,44 @@ def wordcloud_svg(limit_words: int = 120):
 
 # ----------------------------
 # Sentiment counts endpoint (used by frontend to draw pie locally if desired)
+def _current_stats() -> Dict:
+    global last_stats
+    stats, comments = last_stats, last_comments
+    if not stats and comments:
+        stats = _stats_from_comments(comments)
+        with _store_lock:
+            # keep aggregates published for newer comments meanwhile
+            if last_comments is comments and not last_stats:
+                last_stats = stats
+    return stats or _sentiment_stats([])
+
 @app.get("/api/sentiment_counts")
-def sentiment_counts():
-    global last_comments, last_results
-    pos = neu = neg = 0
-    if last_results:
-        for r in last_results:
-            lab = str(r.get("sentiment", "neutral")).lower()
-            if lab == "positive":
-                pos += 1
-            elif lab == "negative":
-                neg += 1
-            else:
-                neu += 1
-    else:
-        for c in last_comments:
-            lab, _ = safe_model_predict(c)
-            if lab == "positive":
-                pos += 1
-            elif lab == "negative":
-                neg += 1
-            else:
-                neu += 1
+def sentiment_counts(language: Optional[str] = None):
+    stats = _current_stats()
+    counts = stats["by_language"].get(language, _empty_counts()) if language else stats
+    pos, neu, neg = counts["positive"], counts["neutral"], counts["negative"]
 
     total = pos + neu + neg
     def pct(x): return round((x / total * 100) if total else 0, 1)
     return {"positive": pos, "neutral": neu, "negative": neg, "total": total,
-            "pcts": {"positive": pct(pos), "neutral": pct(neu), "negative": pct(neg)}}
+            "pcts": {"positive": pct(pos), "neutral": pct(neu), "negative": pct(neg)},
+            "language": language, "by_language": stats["by_language"]}
 
 # ----------------------------
 # Single, canonical sentiment pie endpoint (donut)
 @app.get("/api/sentiment_pie.svg")
-def sentiment_pie_svg(limit_width: int = 900, limit_height: int = 560):
+def sentiment_pie_svg(limit_width: int = 900, limit_height: int = 560, language: Optional[str] = None):
     """
     Full-bleed, responsive SVG donut chart showing sentiment distribution.
     Donut geometry is preserved. Right-hand side shows:
       - Total comments (card)
       - Three rounded legend cards with colored dot, label, and count/percent
+    Pass ?language=<code> (en, hi, ta, te, kn, ml) to chart a single language.
     """
-    global last_comments, last_results
-
-    # compute counts from last_comments (preferred) or last_results
-    counts = {"positive": 0, "negative": 0, "neutral": 0}
-    if last_comments:
-        for c in last_comments:
-            try:
-                lab, _ = safe_model_predict(c)
-            except Exception:
-                lab, _ = rule_sentiment(c)
-            lab = (lab or "").lower()
-            if lab not in counts:
-                lab = "neutral"
-            counts[lab] += 1
-    elif last_results:
-        for r in last_results:
-            lab = str(r.get("sentiment", "neutral")).lower()
-            if lab not in counts:
-                lab = "neutral"
-            counts[lab] += 1
+    # counts come from the aggregates precomputed at ingest
+    stats = _current_stats()
+    source = stats["by_language"].get(language, _empty_counts()) if language else stats
+    counts = {k: source[k] for k in ("positive", "negative", "neutral")}
 
     total = sum(counts.values())
 
@@ -603,7 +958,7 @@ def sentiment_pie_svg(limit_width: int = 900, limit_height: int = 560):
       <g>
         <rect x="{right_x}" y="{total_card_y}" rx="12" ry="12" width="{card_w}" height="84"
               fill="rgba(255,255,255,0.02)" stroke="rgba(255,255,255,0.03)" />
-        <text x="{right_x + 18}" y="{total_card_y + 28}" font-family="Inter, Arial" font-size="13" fill="#9aa7b2">Total comments</text>
+        <text x="{right_x + 18}" y="{total_card_y + 28}" font-family="Inter, Arial" font-size="13" fill="#9aa7b2">Total comments{f" · {html.escape(language)}" if language else ""}</text>
         <text x="{right_x + 18}" y="{total_card_y + 58}" font-family="Inter, Arial" font-size="32" font-weight="700" fill="#e6eef6">{total}</text>
         <text x="{count_x}" y="{total_card_y + 58}" font-family="Inter, Arial" font-size="13" fill="#9aa7b2" text-anchor="end">items</text>
       </g>
@@ -663,15 +1018,54 @@ def sentiment_pie_svg(limit_width: int = 900, limit_height: int = 560):
     svg = "\n".join(svg_parts)
     return Response(content=svg, media_type="image/svg+xml")
 # ----------------------------
+# Topic breakdown for an uploaded dataset (latest by default)
+@app.get("/api/topics")
+def topics(dataset: Optional[int] = None):
+    if topic_model is None:
+        raise HTTPException(status_code=503, detail="Topic clustering requires scikit-learn.")
+    with _topic_datasets_lock:
+        datasets = list(topic_datasets)
+        key = dataset if dataset is not None else (datasets[-1] if datasets else None)
+        entry = topic_datasets.get(key)
+    if not datasets:
+        raise HTTPException(status_code=404, detail="No data — upload CSV to see topics.")
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset {key}.")
+    return {"dataset": entry["dataset"], "time": entry["time"], "rows": entry["rows"],
+            "clustered": entry["assignments"] is not None, "topics": entry["topics"],
+            "datasets": datasets}
+
+# ----------------------------
 # Allow the frontend to set comments directly (already present in your app)
-@app.post("/api/set_comments")
+@app.post("/api/set_comments", dependencies=[Depends(heavy_request)])
 async def set_comments(payload: dict = Body(...)):
-    global last_comments
     comments = payload.get("comments")
     if not isinstance(comments, list):
         raise HTTPException(status_code=400, detail="Expecting JSON body with 'comments' list.")
-    last_comments = [str(c) for c in comments if c is not None]
-    return {"set": len(last_comments)}
+    comments = [str(c) for c in comments if c is not None]
+    store = last_store
+    loop = asyncio.get_running_loop()
+    stats = await loop.run_in_executor(upload_executor, _stored_stats_if_same, store, comments)
+    if stats is None:
+        # new comments: classify in a worker process so the server's GIL stays free
+        stats = await run_classify(_stats_from_comments, comments)
+    await loop.run_in_executor(upload_executor, _publish_comments, store, comments, stats)
+    return {"set": len(comments)}
+
+def _stored_stats_if_same(store: ResultStore, comments: List[str]) -> Optional[Dict]:
+    # the frontend re-syncs the comments it just uploaded: reuse the stored labels
+    # (which honour CSV sentiment columns) instead of reclassifying
+    if comments == store.comments:
+        return _sentiment_stats(store.label_language_pairs())
+    return None
+
+def _publish_comments(store: ResultStore, comments: List[str], stats: Dict):
+    global last_comments, last_stats
+    with _store_lock:
+        # an upload that finished meanwhile is newer; keep its comments and aggregates
+        if last_store is store:
+            last_comments = comments
+            last_stats = stats
 
 # ----------------------------
 # Basic trend endpoints (JSON + simple SVG) — used earlier in conversation
@@ -0,0 +1,49 @@
+# test_language.py
+# Script-based language detection and per-language lexicon routing (run: cd backend && python -m pytest)
+import pandas as pd
+import pytest
+
+from main import detect_language, detect_language_series, rule_sentiment
+
+DETECTION_CASES = [
+    ("This amendment is excellent", "en"),
+    ("இந்த மாற்றம் மக்களுக்கு மிகவும் உதவியாக இருக்கும்", "ta"),
+    ("ఈ నియమాలు మంచి", "te"),
+    ("ಈ ನಿಯಮಗಳು ಉತ್ತಮ", "kn"),
+    ("ഈ നിയമം നല്ലത്", "ml"),
+    ("यह नियम अच्छा है", "hi"),
+    # code-mixed: the script with the most letters wins
+    ("This draft is excellent and will help everyone, धन्यवाद", "en"),
+    ("The rules are bad — नमस्ते", "en"),
+    ("यह नियम बहुत अच्छा है, good", "hi"),
+    # no letters at all
+    ("😀 123", "en"),
+    ("", "en"),
+]
+
+@pytest.mark.parametrize("text,lang", DETECTION_CASES)
+def test_detect_language(text, lang):
+    assert detect_language(text) == lang
+
+def test_series_matches_scalar_detection():
+    texts = [t for t, _ in DETECTION_CASES]
+    assert detect_language_series(pd.Series(texts, dtype=object)).tolist() == [l for _, l in DETECTION_CASES]
+
+@pytest.mark.parametrize("text,label", [
+    ("This draft is excellent and will help everyone, धन्यवाद", "positive"),
+    ("The rules are bad — नमस्ते", "negative"),
+    ("இந்த விதிமுறைகள் மோசமானவை", "negative"),
+    ("यह बहुत खराब है", "negative"),
+    ("ಇದು ಉತ್ತಮ", "positive"),
+    # emoji are shared across languages
+    ("😀", "positive"),
+    ("यह नियम 😂", "positive"),
+    ("this is 😭", "negative"),
+])
+def test_rule_sentiment_routes_by_language(text, label):
+    assert rule_sentiment(text)[0] == label
+
+def test_only_own_lexicon_is_consulted():
+    # the English keyword "good" is not in the Tamil lexicon, so a Tamil comment stays neutral
+    assert rule_sentiment("இந்த மாற்றம் good")[0] == "neutral"
+    assert rule_sentiment("இந்த மாற்றம் good", lang="en")[0] == "positive"
@@ -0,0 +1,119 @@
+# test_store.py
+# Memory footprint and JSON round-trip of the compact ResultStore (run: cd backend && python -m pytest)
+import random, sys
+
+from main import ResultStore, LANGUAGES, _analyze_frame, _read_csv_bytes
+
+N_ROWS = 10000
+# bytes per row on top of the comment string itself (ids, codes, float32, spans, list slots)
+MAX_OVERHEAD_BYTES_PER_ROW = 48
+
+def _sample_rows(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ["policy", "excellent", "burden", "நல்லது", "खराब", "reporting", "threshold", "concern"]
+    rows = []
+    for i in range(n):
+        comment = " ".join(rng.choices(words, k=rng.randint(4, 14)))
+        if rng.random() < 0.5:
+            comment = f"  {comment} . Second sentence here. Third"
+        comment = comment.strip()
+        conf = rng.random()
+        rows.append({
+            "id": i + 1,
+            "title": rng.choice(["Draft A", "Draft B", ""]),
+            "comment": comment,
+            "sentiment": rng.choice(["positive", "negative", "neutral", "Mixed"]),
+            "confidence": conf,
+            "language": rng.choice(LANGUAGES),
+        })
+    return rows
+
+def _expected_row(r):
+    # row dict exactly as the upload endpoints built it before the compact store
+    comment = r["comment"]
+    return {
+        "id": r["id"],
+        "title": r["title"],
+        "comment": comment,
+        "sentiment": r["sentiment"],
+        "confidence": round(round(float(r["confidence"]), 3), 2),
+        "summary": (comment.split(".")[0].strip()) if comment else "",
+        "language": r["language"],
+    }
+
+def _build_store(rows):
+    store = ResultStore()
+    for r in rows:
+        store.append(r["id"], r["title"], r["comment"], r["sentiment"],
+                     round(round(float(r["confidence"]), 3), 2), r["language"])
+    return store
+
+def _deep_size(objs) -> int:
+    # count every distinct object once so shared strings aren't double counted
+    seen, size = set(), 0
+    stack = list(objs)
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.values())
+        elif isinstance(o, list):
+            stack.extend(o)
+    return size
+
+def test_rows_round_trip_legacy_json():
+    rows = _sample_rows(500)
+    store = _build_store(rows)
+    expected = [_expected_row(r) for r in rows]
+    got = store.rows()
+    assert got == expected
+    assert [list(d) for d in got] == [list(d) for d in expected]
+
+def test_analyze_frame_round_trip_legacy_json():
+    # CSV-supplied confidence and sentiment override the model, so every field is deterministic
+    csv_text = (
+        "id,title,comment,sentiment,confidence\n"
+        '7,Draft A,"  Strongly support this policy . It will help. Really",positive,0.876\n'
+        "8,Draft B,This threshold is a burden for small firms,negative,0.3349\n"
+        '9,Draft A,"  இந்த வரைவு நல்லது . நன்றி",neutral,0.5\n'
+        '10,Draft B,"खराब नीति. बदलें",Mixed,0.994\n'
+    )
+    store = _analyze_frame(_read_csv_bytes(csv_text.encode("utf-8")), ResultStore())
+    expected = [_expected_row(r) for r in [
+        {"id": 7, "title": "Draft A", "comment": "Strongly support this policy . It will help. Really",
+         "sentiment": "positive", "confidence": 0.876, "language": "en"},
+        {"id": 8, "title": "Draft B", "comment": "This threshold is a burden for small firms",
+         "sentiment": "negative", "confidence": 0.3349, "language": "en"},
+        {"id": 9, "title": "Draft A", "comment": "இந்த வரைவு நல்லது . நன்றி",
+         "sentiment": "neutral", "confidence": 0.5, "language": "ta"},
+        {"id": 10, "title": "Draft B", "comment": "खराब नीति. बदलें",
+         "sentiment": "Mixed", "confidence": 0.994, "language": "hi"},
+    ]]
+    got = store.rows()
+    assert got == expected
+    assert [list(d) for d in got] == [list(d) for d in expected]
+    assert got[0]["summary"] == "Strongly support this policy"
+
+def test_extend_preserves_rows():
+    rows = _sample_rows(300, seed=1)
+    a, b = _build_store(rows[:120]), _build_store(rows[120:])
+    a.extend(b)
+    assert a.rows() == [_expected_row(r) for r in rows]
+
+def test_memory_per_row():
+    rows = _sample_rows(N_ROWS)
+    store = _build_store(rows)
+    dicts = [_expected_row(r) for r in rows]
+
+    store_per_row = store.nbytes() / N_ROWS
+    overhead_per_row = (store.nbytes() - sum(sys.getsizeof(c) for c in store.comments)) / N_ROWS
+    dicts_per_row = _deep_size([dicts]) / N_ROWS
+
+    assert overhead_per_row < MAX_OVERHEAD_BYTES_PER_ROW, (
+        f"ResultStore overhead {overhead_per_row:.1f} bytes/row beyond the comment "
+        f"(limit {MAX_OVERHEAD_BYTES_PER_ROW})")
+    assert store_per_row < dicts_per_row / 2, (
+        f"ResultStore {store_per_row:.1f} bytes/row vs list of dicts {dicts_per_row:.1f} bytes/row")
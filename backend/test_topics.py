@@ -0,0 +1,74 @@
+# test_topics.py
+# Incremental topic clustering and /api/topics (run: cd backend && python -m pytest)
+import pytest
+
+pytest.importorskip("sklearn")
+from fastapi.testclient import TestClient
+
+import main
+from main import ResultStore, TopicModel
+
+COMMENTS = [
+    "reporting threshold is too high for small firms",
+    "small firms cannot meet the reporting threshold",
+    "penalty for late filing is excessive",
+    "late filing penalty should be reduced",
+    "excellent draft and clear governance rules",
+    "clear governance rules, excellent work",
+    "threshold for reporting should be lowered",
+    "penalty waiver for first late filing",
+]
+
+def _store(comments):
+    store = ResultStore()
+    for i, c in enumerate(comments):
+        store.append(i + 1, "", c, "positive" if i % 2 == 0 else "negative", 0.9, "en")
+    return store
+
+@pytest.fixture
+def fresh_topics(monkeypatch):
+    monkeypatch.setattr(main, "topic_model", TopicModel(3))
+    monkeypatch.setattr(main, "topic_datasets", {})
+    monkeypatch.setattr(main, "_dataset_seq", 0)
+    return main.topic_model
+
+def test_update_holds_back_then_fits_then_partial_fits():
+    tm = TopicModel(3)
+    assert tm.update(COMMENTS[:2]) is None
+    assert not tm.fitted and tm._pending == COMMENTS[:2]
+
+    # first fit includes the held-back comments but only labels the new ones
+    first = tm.update(COMMENTS[2:5])
+    assert tm.fitted and tm._pending == []
+    assert len(first) == 3 and all(0 <= t < 3 for t in first)
+    centers = tm.kmeans.cluster_centers_.copy()
+
+    later = tm.update(COMMENTS[5:])
+    assert len(later) == len(COMMENTS[5:])
+    assert (tm.kmeans.cluster_centers_ != centers).any()
+
+def test_topics_endpoint_numbers_datasets_without_gaps(fresh_topics, monkeypatch):
+    client = TestClient(main.app)
+    main._record_topics(_store(COMMENTS[:2]))
+    r = client.get("/api/topics")
+    assert r.status_code == 200
+    assert r.json()["clustered"] is False and r.json()["topics"] == []
+
+    main._record_topics(_store(COMMENTS))
+    body = client.get("/api/topics").json()
+    assert body["dataset"] == 2 and body["clustered"] is True
+    assert sum(t["total"] for t in body["topics"]) == len(COMMENTS)
+    assert sum(t["positive"] + t["negative"] + t["neutral"] for t in body["topics"]) == len(COMMENTS)
+
+    def boom(comments):
+        raise RuntimeError("clustering failed")
+    with monkeypatch.context() as m:
+        m.setattr(fresh_topics, "update", boom)
+        main._record_topics(_store(COMMENTS))
+    main._record_topics(_store(COMMENTS[:4]))
+
+    body = client.get("/api/topics").json()
+    assert body["datasets"] == [1, 2, 3]
+    assert body["dataset"] == 3 and body["rows"] == 4
+    assert client.get("/api/topics", params={"dataset": 1}).json()["rows"] == 2
+    assert client.get("/api/topics", params={"dataset": 9}).status_code == 404
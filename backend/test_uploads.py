@@ -0,0 +1,66 @@
+# test_uploads.py
+# Multi-file ids, response bodies, set_comments and dead-worker recovery (run: cd backend && python -m pytest)
+import os, signal
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+GOOD_A = b"title,comment\nA1,Good policy overall\nA2,This is a burden\n"
+BAD_IDS = b"id,title,comment\nx,B1,Not a number id\n"
+GOOD_C = b"title,comment\nC1,Reporting threshold is fine\n"
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as c:
+        yield c
+
+def _kill_classify_workers():
+    pool = main.classify_executor()
+    pool.submit(os.getpid).result()  # make sure workers exist
+    procs = list(pool._processes.values())
+    for proc in procs:
+        os.kill(proc.pid, signal.SIGKILL)
+    for proc in procs:
+        proc.join()
+
+def test_default_ids_skip_failed_files(client):
+    files = [("files", ("a.csv", GOOD_A, "text/csv")),
+             ("files", ("b.csv", BAD_IDS, "text/csv")),
+             ("files", ("c.csv", GOOD_C, "text/csv"))]
+    r = client.post("/api/upload_csvs", files=files)
+    assert r.status_code == 200
+    body = r.json()
+    assert [row["id"] for row in body["results"]] == [1, 2, 3]
+    assert [row["title"] for row in body["results"]] == ["A1", "A2", "C1"]
+    assert r.headers["content-type"] == "application/json"
+    assert body["inserted"] == 3 and body["rows"] == body["results"]
+    reports = body["files"]
+    assert [rep["row_range"] for rep in reports] == [[0, 2], None, [2, 3]]
+    assert reports[1]["error"] and reports[1]["rows"] == 0
+
+def test_dead_worker_returns_503_then_recovers(client):
+    _kill_classify_workers()
+    r = client.post("/api/upload_csvs", files=[("files", ("a.csv", GOOD_A, "text/csv"))])
+    assert r.status_code == 503
+    assert r.headers["Retry-After"]
+
+    _kill_classify_workers()
+    r = client.post("/api/upload_csv", files={"file": ("a.csv", GOOD_A, "text/csv")})
+    assert r.status_code == 503
+
+    r = client.post("/api/upload_csv", files={"file": ("a.csv", GOOD_A, "text/csv")})
+    assert r.status_code == 200
+    assert r.json()["inserted"] == 2
+
+def test_set_comments_classifies_new_comments(client):
+    r = client.post("/api/upload_csv", files={"file": ("a.csv", GOOD_A, "text/csv")})
+    assert r.status_code == 200 and r.json()["rows"] == r.json()["results"]
+
+    comments = ["Excellent reform", "இந்த வரைவு நல்லது", "Terrible burden", "खराब नीति"]
+    assert client.post("/api/set_comments", json={"comments": comments}).json() == {"set": 4}
+    counts = client.get("/api/sentiment_counts").json()
+    assert counts["total"] == 4
+    assert sum(c["total"] for c in counts["by_language"].values()) == 4
+    assert counts["by_language"]["ta"]["total"] == 1
@@ -46,20 +46,33 @@ export async function postAnalyzeCsv(file) {
 // -------------------------------
 // Upload multiple CSVs in one go
 // -------------------------------
+// The backend parses and classifies the files concurrently and returns the merged
+// rows plus a per-file report ({ filename, rows, row_range, parse_ms, classify_ms, error }).
 export async function postAnalyzeMultiple(files) {
-  // Merge files client-side before sending, OR send sequentially
-  const allResults = [];
+  const url = `${API_BASE}/api/upload_csvs`;
+  const form = new FormData();
   for (const file of files) {
-    try {
-      const res = await postAnalyzeCsv(file);
-      if (res?.rows) {
-        allResults.push(...res.rows);
-      }
-    } catch (err) {
-      console.error("Failed for", file.name, err);
-    }
+    form.append("files", file, file.name);
+  }
+
+  const resp = await fetch(url, { method: "POST", body: form });
+
+  if (!resp.ok) {
+    const err = await toJsonSafe(resp);
+    const detail = err.detail?.message ?? err.detail;
+    const fileErrors = (err.detail?.files || [])
+      .filter((f) => f.error)
+      .map((f) => `${f.filename}: ${f.error}`);
+    const msg =
+      [detail, ...fileErrors].filter(Boolean).join(" — ") ||
+      err.error ||
+      err._raw ||
+      resp.statusText ||
+      `HTTP ${resp.status}`;
+    throw new Error(msg);
   }
-  return { rows: allResults };
+
+  return toJsonSafe(resp);
 }
 
 // -------------------------------
@@ -79,6 +92,26 @@ export async function getTrendSummary() {
   return toJsonSafe(resp);
 }
 
+// -------------------------------
+// Sentiment counts (overall + by_language); pass a language code to filter
+// -------------------------------
+export async function getSentimentCounts(language) {
+  const qs = language ? `?language=${encodeURIComponent(language)}` : "";
+  const resp = await fetch(`${API_BASE}/api/sentiment_counts${qs}`);
+  if (!resp.ok) return null;
+  return toJsonSafe(resp);
+}
+
+// -------------------------------
+// Topic clusters with per-topic sentiment counts (latest upload unless dataset given)
+// -------------------------------
+export async function getTopics(dataset) {
+  const qs = dataset != null ? `?dataset=${encodeURIComponent(dataset)}` : "";
+  const resp = await fetch(`${API_BASE}/api/topics${qs}`);
+  if (!resp.ok) return null;
+  return toJsonSafe(resp);
+}
+
 // -------------------------------
 // Wordcloud helper (frontend uses in button)
 // -------------------------------
@@ -1,5 +1,6 @@
 // src/components/PieChart.jsx
 import React, { useEffect, useState, useMemo } from "react";
+import { getSentimentCounts } from "../api";
 
 /**
  * PieChart component
@@ -9,17 +10,19 @@ import React, { useEffect, useState, useMemo } from "react";
  *  - width: optional px width (default: responsive)
  *  - height: optional px height
  *  - apiFullSvg: optional URL to open for full-screen SVG (defaults to /api/sentiment_pie.svg)
+ *  - language: optional language code (en, hi, ta, te, kn, ml) to chart a single language
  *
  * Behavior:
  *  - If `data` prop is provided it is used.
- *  - Otherwise the component requests /api/sentiment_summary (GET) expecting JSON { positive, negative, neutral }.
+ *  - Otherwise the component requests /api/sentiment_counts (GET, ?language= when given) expecting JSON { positive, negative, neutral }.
  *  - If nothing is available it renders an empty state.
  */
 export default function PieChart({
   data = null,
   width = 520,
   height = 420,
-  apiFullSvg = "/api/sentiment_pie.svg"
+  apiFullSvg = "/api/sentiment_pie.svg",
+  language = null
 }) {
   const [counts, setCounts] = useState(data);
   const [hover, setHover] = useState(null);
@@ -31,12 +34,11 @@ export default function PieChart({
     let mounted = true;
     (async () => {
       try {
-        const resp = await fetch("/api/sentiment_summary");
-        if (!resp.ok) {
+        const json = await getSentimentCounts(language);
+        if (!json) {
           // not fatal — keep empty
           return;
         }
-        const json = await resp.json();
         if (mounted) {
           // expect json.positive etc — fallback to 0 if missing
           setCounts({
@@ -51,7 +53,7 @@ export default function PieChart({
       }
     })();
     return () => { mounted = false; };
-  }, [data]);
+  }, [data, language]);
 
   // compute totals and percentages
   const summary = useMemo(() => {
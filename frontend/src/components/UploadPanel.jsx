@@ -1,13 +1,19 @@
 // src/components/UploadPanel.jsx
 import React, { useState } from "react";
 import Papa from "papaparse";
-import { postAnalyzeCsv, API_BASE } from "../api";
+import { postAnalyzeMultiple, getTopics, getSentimentCounts, API_BASE } from "../api";
+import PieChart from "./PieChart";
 
 export default function UploadPanel({ onSummary = () => {} }) {
   const [fileNames, setFileNames] = useState([]);
   const [rows, setRows] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
+  const [topics, setTopics] = useState([]);
+  // language breakdown for the chart ("" = all languages)
+  const [languages, setLanguages] = useState([]);
+  const [chartLanguage, setChartLanguage] = useState("");
+  const [analysisSeq, setAnalysisSeq] = useState(0);
 
   // Local preview for the first file chosen (quick UX)
   function handleLocalPreview(file) {
@@ -41,20 +47,25 @@ export default function UploadPanel({ onSummary = () => {} }) {
     setLoading(true);
     try {
       const allRows = [];
-      for (const f of files) {
-        const data = await postAnalyzeCsv(f);
-        const list = data.results ?? data.rows ?? data;
-        if (Array.isArray(list)) {
-          list.forEach((r) => {
-            allRows.push({
-              id: r.id ?? (allRows.length + 1),
-              title: r.title ?? "",
-              comment: r.comment ?? r.summary ?? "",
-              sentiment: (r.sentiment ?? r.Sentiment ?? "").toString(),
-              confidence: r.confidence ?? r.Confidence ?? ""
-            });
+      const data = await postAnalyzeMultiple(files);
+      const list = data.results ?? data.rows ?? data;
+      if (Array.isArray(list)) {
+        list.forEach((r) => {
+          allRows.push({
+            id: r.id ?? (allRows.length + 1),
+            title: r.title ?? "",
+            comment: r.comment ?? r.summary ?? "",
+            sentiment: (r.sentiment ?? r.Sentiment ?? "").toString(),
+            confidence: r.confidence ?? r.Confidence ?? "",
+            language: r.language ?? ""
           });
-        }
+        });
+      }
+
+      // files that failed are skipped by the backend; surface them without dropping the rest
+      const failed = (data.files || []).filter(f => f.error);
+      if (failed.length) {
+        setError(`Skipped ${failed.length} file(s): ${failed.map(f => `${f.filename} (${f.error})`).join("; ")}`);
       }
 
       if (!allRows.length) {
@@ -68,10 +79,24 @@ export default function UploadPanel({ onSummary = () => {} }) {
       const pos = allRows.filter(r => String(r.sentiment || "").toLowerCase() === "positive").length;
       const neg = allRows.filter(r => String(r.sentiment || "").toLowerCase() === "negative").length;
       const neu = allRows.filter(r => String(r.sentiment || "").toLowerCase() === "neutral").length;
-      const summaryText = `Analysis complete — ${total} rows processed. Positive: ${pos}, Neutral: ${neu}, Negative: ${neg}.`;
+      const byLang = {};
+      allRows.forEach(r => { if (r.language) byLang[r.language] = (byLang[r.language] || 0) + 1; });
+      const langText = Object.keys(byLang).length
+        ? ` Languages: ${Object.entries(byLang).map(([l, n]) => `${l} ${n}`).join(", ")}.`
+        : "";
+      const summaryText = `Analysis complete — ${total} rows processed. Positive: ${pos}, Neutral: ${neu}, Negative: ${neg}.${langText}`;
 
       onSummary(summaryText); // <-- only here
 
+      const topicData = await getTopics();
+      setTopics(topicData?.topics ?? []);
+
+      const counts = await getSentimentCounts();
+      const langs = Object.keys(counts?.by_language ?? {});
+      setLanguages(langs);
+      setChartLanguage((cur) => (langs.includes(cur) ? cur : ""));
+      setAnalysisSeq((n) => n + 1);
+
       // sync merged comments to backend
       try {
         const comments = allRows.map(r => r.comment || "");
@@ -109,7 +134,7 @@ export default function UploadPanel({ onSummary = () => {} }) {
       setError("No analysis to download — upload CSV(s) first.");
       return;
     }
-    const cols = ["id","title","comment","sentiment","confidence"];
+    const cols = ["id","title","comment","language","sentiment","confidence"];
     const csvRows = [cols.join(",")];
     rows.forEach(r => {
       const vals = cols.map(c => `"${String(r[c] ?? "").replace(/"/g, '""')}"`);
@@ -197,6 +222,7 @@ export default function UploadPanel({ onSummary = () => {} }) {
             <tr>
               <th style={{padding:"12px 8px"}}>ID</th>
               <th style={{padding:"12px 8px"}}>Title</th>
+              <th style={{padding:"12px 8px"}}>Language</th>
               <th style={{padding:"12px 8px"}}>Sentiment</th>
               <th style={{padding:"12px 8px"}}>Confidence</th>
               <th style={{padding:"12px 8px"}}>Summary</th>
@@ -207,6 +233,7 @@ export default function UploadPanel({ onSummary = () => {} }) {
               <tr key={idx} style={{borderTop:"1px solid rgba(255,255,255,0.03)"}}>
                 <td style={{padding:"10px 8px"}}>{r.id}</td>
                 <td style={{padding:"10px 8px"}}>{r.title}</td>
+                <td style={{padding:"10px 8px"}}>{r.language || "-"}</td>
                 <td style={{padding:"10px 8px", color: r.sentiment === "negative" ? "#ff6b6b" : r.sentiment === "positive" ? "#4bbf73" : "#9aa7b2"}}>
                   {r.sentiment ?? "-"}
                 </td>
@@ -215,12 +242,61 @@ export default function UploadPanel({ onSummary = () => {} }) {
               </tr>
             )) : (
               <tr>
-                <td colSpan={5} style={{padding:20, color:"#7b8794"}}>No preview data. Upload a CSV to analyze.</td>
+                <td colSpan={6} style={{padding:20, color:"#7b8794"}}>No preview data. Upload a CSV to analyze.</td>
               </tr>
             )}
           </tbody>
         </table>
       </div>
+
+      {analysisSeq > 0 && (
+        <div style={{background:"#071225", borderRadius:8, padding:12, marginTop:18}}>
+          <div style={{display:"flex", gap:10, alignItems:"center", color:"#9aa7b2", marginBottom:8}}>
+            <label htmlFor="chartLanguage">Language</label>
+            <select
+              id="chartLanguage"
+              value={chartLanguage}
+              onChange={(e) => setChartLanguage(e.target.value)}
+              style={{background:"#0b1a2e", color:"#e6eef6", border:"1px solid rgba(255,255,255,0.08)", borderRadius:6, padding:"6px 8px"}}
+            >
+              <option value="">All languages</option>
+              {languages.map((l) => <option key={l} value={l}>{l}</option>)}
+            </select>
+          </div>
+          <PieChart
+            key={`${analysisSeq}-${chartLanguage}`}
+            language={chartLanguage || null}
+            apiFullSvg={`${API_BASE}/api/sentiment_pie.svg${chartLanguage ? `?language=${encodeURIComponent(chartLanguage)}` : ""}`}
+          />
+        </div>
+      )}
+
+      {topics.length > 0 && (
+        <div style={{background:"#071225", borderRadius:8, padding:6, marginTop:18}}>
+          <table style={{width:"100%", borderCollapse:"collapse"}}>
+            <thead style={{color:"#9aa7b2", textAlign:"left"}}>
+              <tr>
+                <th style={{padding:"12px 8px"}}>Topic</th>
+                <th style={{padding:"12px 8px"}}>Top terms</th>
+                <th style={{padding:"12px 8px"}}>Positive</th>
+                <th style={{padding:"12px 8px"}}>Neutral</th>
+                <th style={{padding:"12px 8px"}}>Negative</th>
+              </tr>
+            </thead>
+            <tbody>
+              {topics.map((t) => (
+                <tr key={t.topic} style={{borderTop:"1px solid rgba(255,255,255,0.03)"}}>
+                  <td style={{padding:"10px 8px"}}>{t.topic}</td>
+                  <td style={{padding:"10px 8px"}}>{t.terms.join(", ")}</td>
+                  <td style={{padding:"10px 8px", color:"#4bbf73"}}>{t.positive}</td>
+                  <td style={{padding:"10px 8px", color:"#9aa7b2"}}>{t.neutral}</td>
+                  <td style={{padding:"10px 8px", color:"#ff6b6b"}}>{t.negative}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      )}
     </div>
   );
 }
\ No newline at end of file